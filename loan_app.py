@@ -10,8 +10,11 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import math
-from datetime import datetime
-import io
+import functools
+from datetime import datetime, date
+
+FLOAT32_EXACT_DOLLARS = 2 ** 17
+BREAKEVEN_COLOR_CAP_MONTHS = 120
 
 # Configure page
 st.set_page_config(
@@ -21,6 +24,82 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def _pmt_scalar(principal, monthly_rate, num_payments):
+    growth = (1 + monthly_rate) ** num_payments
+    return principal * monthly_rate * growth / (growth - 1)
+
+@functools.cache
+def _monthly_payment(principal, monthly_rate, num_payments):
+    if monthly_rate == 0:
+        return principal / num_payments
+
+    return _pmt_scalar(principal, monthly_rate, num_payments)
+
+def pmt_vec(rate_pct, years, principal):
+    # Broadcasting PMT: pass rates as a column and terms as a row for a grid
+    r = np.asarray(rate_pct, dtype=np.float64) / 1200
+    n = np.trunc(np.asarray(years, dtype=np.float64) * 12)
+    growth = (1 + r) ** n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(r == 0, principal / n, principal * r * growth / (growth - 1))
+
+def _to_cents(values, dtype):
+    # Computed in float64 and rounded first; callers only pick float32 below
+    # FLOAT32_EXACT_DOLLARS, where the cast cannot move a value to another cent
+    return np.round(values, 2).astype(dtype)
+
+@st.cache_data
+def amortization_schedule(principal, rate, years, start_date):
+    n = int(years * 12)
+    r = rate / 100 / 12
+    payment = _monthly_payment(principal, r, n)
+
+    # Closed-form balances: B_k = P(1+r)^k - M((1+r)^k - 1)/r
+    k = np.arange(1, n + 1, dtype=np.float64)
+    if rate == 0:
+        ending = principal - payment * k
+    else:
+        # In-place to avoid a temporary per operator
+        growth = np.power(1 + r, k)
+        ending = growth * principal
+        growth -= 1
+        growth *= payment / r
+        ending -= growth
+    beginning = np.concatenate(([principal], ending[:-1]))
+    interest = beginning * r
+    principal_paid = payment - interest
+
+    # One payment per month on the start date's day, clamped to short months
+    start = np.datetime64(pd.Timestamp(start_date).date())
+    start_month = start.astype('datetime64[M]')
+    months = start_month + np.arange(n)
+    first_days = months.astype('datetime64[D]')
+    month_lengths = (months + 1).astype('datetime64[D]') - first_days
+    day_offset = start - start_month.astype('datetime64[D]')
+    dates = np.datetime_as_string(first_days + np.minimum(day_offset, month_lengths - 1), unit='D')
+
+    cumulative_interest = np.cumsum(interest)
+
+    money_columns = {
+        'Beginning_Balance': beginning,
+        'Monthly_Payment': np.full(n, payment),
+        'Principal_Payment': principal_paid,
+        'Interest_Payment': interest,
+        'Ending_Balance': np.maximum(ending, 0),
+        'Cumulative_Interest': cumulative_interest
+    }
+
+    # float32 halves the frame but its spacing stays under a cent only below 2**17 dollars (~$131k),
+    # so every money column has to fit, including the payment on very short terms
+    largest = max(np.abs(values).max() for values in money_columns.values())
+    money = np.float32 if largest < FLOAT32_EXACT_DOLLARS else np.float64
+
+    return pd.DataFrame({
+        'Payment_Number': np.arange(1, n + 1, dtype=np.int32),
+        'Date': dates,
+        **{name: _to_cents(values, money) for name, values in money_columns.items()}
+    })
+
 class LoanAnalyzer:
     def __init__(self, principal, annual_rate, years):
         self.principal = principal
@@ -30,90 +109,54 @@ class LoanAnalyzer:
         self.num_payments = int(years * 12)
         
     def calculate_monthly_payment(self):
-        if self.annual_rate == 0:
-            return self.principal / self.num_payments
-        
-        payment = self.principal * (self.monthly_rate * (1 + self.monthly_rate)**self.num_payments) / ((1 + self.monthly_rate)**self.num_payments - 1)
-        return payment
+        return _monthly_payment(self.principal, self.monthly_rate, self.num_payments)
     
     def create_amortization_schedule(self, start_date=None):
+        # Key the cache on the calendar day, not the current instant
         if start_date is None:
-            start_date = datetime.now()
+            start_date = date.today()
             
-        monthly_payment = self.calculate_monthly_payment()
-        schedule = []
-        balance = self.principal
-        cumulative_interest = 0
-        current_date = start_date
-        
-        for payment_num in range(1, self.num_payments + 1):
-            interest_payment = balance * self.monthly_rate
-            principal_payment = monthly_payment - interest_payment
-            balance -= principal_payment
-            cumulative_interest += interest_payment
-            
-            schedule.append({
-                'Payment_Number': payment_num,
-                'Date': current_date.strftime('%Y-%m-%d'),
-                'Beginning_Balance': balance + principal_payment,
-                'Monthly_Payment': monthly_payment,
-                'Principal_Payment': principal_payment,
-                'Interest_Payment': interest_payment,
-                'Ending_Balance': max(0, balance),
-                'Cumulative_Interest': cumulative_interest
-            })
-            
-            # Move to next month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
-                
-            if balance <= 0:
-                break
-                
-        return pd.DataFrame(schedule)
+        return amortization_schedule(self.principal, self.annual_rate, self.years, start_date)
+
+@functools.lru_cache(maxsize=128)
+def get_analyzer(principal, rate, years):
+    # One shared analyzer per loan across tabs and fragment reruns
+    return LoanAnalyzer(principal, rate, years)
 
+@st.cache_resource
 def create_amortization_chart(schedule_df, title="Amortization Schedule"):
-    fig = make_subplots(
-        rows=2, cols=1,
-        subplot_titles=('Principal vs Interest Over Time', 'Remaining Balance'),
-        vertical_spacing=0.12
-    )
-    
-    # Principal vs Interest
-    fig.add_trace(
-        go.Scatter(
-            x=schedule_df['Payment_Number'],
+    payment_numbers = schedule_df['Payment_Number']
+    traces = [
+        # Principal vs Interest
+        go.Scattergl(
+            x=payment_numbers,
             y=schedule_df['Principal_Payment'],
             name='Principal Payment',
             fill='tonexty',
             line=dict(color='#27AE60')
         ),
-        row=1, col=1
-    )
-    
-    fig.add_trace(
-        go.Scatter(
-            x=schedule_df['Payment_Number'],
+        go.Scattergl(
+            x=payment_numbers,
             y=schedule_df['Interest_Payment'],
             name='Interest Payment',
             fill='tozeroy',
             line=dict(color='#E74C3C')
         ),
-        row=1, col=1
-    )
-    
-    # Remaining Balance
-    fig.add_trace(
-        go.Scatter(
-            x=schedule_df['Payment_Number'],
+        # Remaining Balance
+        go.Scattergl(
+            x=payment_numbers,
             y=schedule_df['Ending_Balance'],
             name='Remaining Balance',
             line=dict(color='#3498DB', width=3)
-        ),
-        row=2, col=1
+        )
+    ]
+    
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=('Principal vs Interest Over Time', 'Remaining Balance'),
+        vertical_spacing=0.12
     )
+    fig.add_traces(traces, rows=[1, 1, 2], cols=[1, 1, 1])
     
     fig.update_layout(
         title=title,
@@ -123,6 +166,287 @@ def create_amortization_chart(schedule_df, title="Amortization Schedule"):
     
     return fig
 
+@st.cache_resource
+def create_breakeven_heatmap(principal, current_payment, refi_costs, new_rate, title="Break-even Sensitivity"):
+    rates = np.round(np.linspace(max(new_rate - 1.5, 0), new_rate + 1.5, 25), 3)
+    terms = np.arange(10, 31)
+    
+    # Whole rate x term grid in one vectorized call
+    savings = current_payment - pmt_vec(rates[:, None], terms[None, :], principal)
+    positive = savings > 0
+    breakeven = np.where(positive, refi_costs / np.where(positive, savings, 1), np.nan)
+    
+    # Near-zero savings give break-evens in the thousands of months; cap the
+    # colour scale so the useful range stays readable (hover keeps true values)
+    fig = go.Figure(go.Heatmap(
+        z=breakeven,
+        x=terms,
+        y=rates,
+        zmin=0,
+        zmax=BREAKEVEN_COLOR_CAP_MONTHS,
+        colorscale='RdYlGn_r',
+        colorbar=dict(title='Months', tickvals=[0, 30, 60, 90, 120], ticktext=['0', '30', '60', '90', '120+']),
+        hovertemplate='Term: %{x} yrs<br>Rate: %{y:.2f}%<br>Break-even: %{z:.1f} months<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title='New Term (years)',
+        yaxis_title='New Rate (%)',
+        height=400
+    )
+    
+    return fig
+
+@st.cache_data
+def export_csv(export_df):
+    return export_df.to_csv(index=False).encode('utf-8')
+
+def render_dashboard(apartment_analyzer, investment_analyzer):
+    st.header("Portfolio Overview")
+    
+    # Current loan summary
+    col1, col2, col3, col4 = st.columns(4)
+    
+    apt_principal, apt_rate, apt_term = apartment_analyzer.principal, apartment_analyzer.annual_rate, apartment_analyzer.years
+    inv_principal, inv_rate, inv_term = investment_analyzer.principal, investment_analyzer.annual_rate, investment_analyzer.years
+    apt_payment = apartment_analyzer.calculate_monthly_payment()
+    inv_payment = investment_analyzer.calculate_monthly_payment()
+    total_payment = apt_payment + inv_payment
+    total_principal = apt_principal + inv_principal
+    
+    with col1:
+        st.metric("Total Loan Amount", f"${total_principal:,.0f}")
+    with col2:
+        st.metric("Total Monthly Payment", f"${total_payment:,.0f}")
+    with col3:
+        weighted_rate = (apt_principal * apt_rate + inv_principal * inv_rate) / total_principal
+        st.metric("Weighted Avg Rate", f"{weighted_rate:.2f}%")
+    with col4:
+        total_interest = (apt_payment * apt_term * 12 - apt_principal) + (inv_payment * inv_term * 12 - inv_principal)
+        st.metric("Total Interest (Life of Loans)", f"${total_interest:,.0f}")
+
+def render_refinance_column(analyzer, key_prefix, title, name, checkbox_label, default_rate, default_costs):
+    st.subheader(title)
+    
+    refinance = st.checkbox(checkbox_label, key=f"{key_prefix}_refi")
+    current_payment = analyzer.calculate_monthly_payment()
+    
+    if not refinance:
+        return {
+            'refinance': False,
+            'new_rate': analyzer.annual_rate,
+            'new_term': analyzer.years,
+            'new_payment': current_payment,
+            'savings': 0,
+            'refi_costs': 0
+        }
+    
+    new_rate = st.number_input(f"New {name} Rate (%)", value=default_rate, step=0.01, key=f"{key_prefix}_new_rate")
+    new_term = st.number_input(f"New {name} Term (years)", value=25, step=1, key=f"{key_prefix}_new_term")
+    refi_costs = st.number_input(f"{name} Refi Costs ($)", value=default_costs, step=100, key=f"{key_prefix}_refi_costs")
+    
+    # Calculate new payment
+    new_payment = get_analyzer(analyzer.principal, new_rate, new_term).calculate_monthly_payment()
+    savings = current_payment - new_payment
+    
+    st.write(f"**Current Payment:** ${current_payment:,.0f}")
+    st.write(f"**New Payment:** ${new_payment:,.0f}")
+    
+    if savings > 0:
+        st.success(f"**Monthly Savings:** ${savings:,.0f}")
+        st.success(f"**Break-even:** {refi_costs / savings:.1f} months")
+    else:
+        st.error(f"**Monthly Increase:** ${abs(savings):,.0f}")
+    
+    with st.expander("📉 Break-even Sensitivity"):
+        heatmap = create_breakeven_heatmap(analyzer.principal, current_payment, refi_costs, new_rate, f"{name} Break-even (months)")
+        st.plotly_chart(heatmap, use_container_width=True)
+    
+    return {
+        'refinance': True,
+        'new_rate': new_rate,
+        'new_term': new_term,
+        'new_payment': new_payment,
+        'savings': savings,
+        'refi_costs': refi_costs
+    }
+
+def render_refinancing(apartment_analyzer, investment_analyzer):
+    # Not a fragment: the refinance inputs feed every other tab
+    st.header("🔄 Independent Refinancing Analysis")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        apt = render_refinance_column(apartment_analyzer, "apt", "🏢 Apartment Loan", "Apartment", "Refinance Apartment Loan", 4.99, 3000)
+    with col2:
+        inv = render_refinance_column(investment_analyzer, "inv", "🏘️ Investment Property", "Investment", "Refinance Investment Property", 5.99, 2000)
+    
+    # Combined results
+    st.subheader("🏠 Combined Portfolio Results")
+    
+    total_payment = apartment_analyzer.calculate_monthly_payment() + investment_analyzer.calculate_monthly_payment()
+    total_new_payment = apt['new_payment'] + inv['new_payment']
+    total_savings = apt['savings'] + inv['savings']
+    total_refi_costs = apt['refi_costs'] + inv['refi_costs']
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Current Total Payment", f"${total_payment:,.0f}")
+    with col2:
+        st.metric("New Total Payment", f"${total_new_payment:,.0f}")
+    with col3:
+        if total_savings > 0:
+            st.metric("Total Monthly Savings", f"${total_savings:,.0f}", delta=f"+${total_savings:,.0f}")
+        else:
+            st.metric("Total Monthly Change", f"${total_savings:,.0f}", delta=f"{total_savings:,.0f}")
+    with col4:
+        if total_savings > 0 and total_refi_costs > 0:
+            st.metric("Combined Break-even", f"{total_refi_costs / total_savings:.1f} months")
+        else:
+            st.metric("Combined Break-even", "N/A")
+    
+    return {'apt': apt, 'inv': inv}
+
+@st.fragment
+def render_amortization(schedules):
+    st.header("📈 Amortization Schedules")
+    
+    loan_choice = st.selectbox("Select Loan to Visualize", ["Apartment", "Investment Property", "Both"])
+    
+    if loan_choice in ["Apartment", "Both"]:
+        st.subheader("🏢 Apartment Loan Amortization")
+        
+        # Choose current or refinanced
+        if schedules['apt_refi'] is not None:
+            apt_schedule_choice = st.radio("Apartment Schedule", ["Current", "Refinanced"], key="apt_sched_choice")
+            if apt_schedule_choice == "Refinanced":
+                apt_schedule = schedules['apt_refi']
+            else:
+                apt_schedule = schedules['apt_current']
+        else:
+            apt_schedule = schedules['apt_current']
+        
+        apt_chart = create_amortization_chart(apt_schedule, "Apartment Loan Amortization")
+        st.plotly_chart(apt_chart, use_container_width=True)
+    
+    if loan_choice in ["Investment Property", "Both"]:
+        st.subheader("🏘️ Investment Property Amortization")
+        
+        # Choose current or refinanced
+        if schedules['inv_refi'] is not None:
+            inv_schedule_choice = st.radio("Investment Schedule", ["Current", "Refinanced"], key="inv_sched_choice")
+            if inv_schedule_choice == "Refinanced":
+                inv_schedule = schedules['inv_refi']
+            else:
+                inv_schedule = schedules['inv_current']
+        else:
+            inv_schedule = schedules['inv_current']
+        
+        inv_chart = create_amortization_chart(inv_schedule, "Investment Property Amortization")
+        st.plotly_chart(inv_chart, use_container_width=True)
+
+@st.fragment
+def render_schedules(schedules):
+    st.header("📋 Detailed Payment Schedules")
+    
+    schedule_choice = st.selectbox("Select Schedule", [
+        "Current Apartment",
+        "Current Investment",
+        "Refinanced Apartment" if schedules['apt_refi'] is not None else None,
+        "Refinanced Investment" if schedules['inv_refi'] is not None else None
+    ])
+    
+    if schedule_choice == "Current Apartment":
+        schedule_df = schedules['apt_current']
+    elif schedule_choice == "Current Investment":
+        schedule_df = schedules['inv_current']
+    elif schedule_choice == "Refinanced Apartment" and schedules['apt_refi'] is not None:
+        schedule_df = schedules['apt_refi']
+    elif schedule_choice == "Refinanced Investment" and schedules['inv_refi'] is not None:
+        schedule_df = schedules['inv_refi']
+    else:
+        st.warning("Please select a valid schedule option.")
+        return
+    
+    # Display options
+    show_full = st.checkbox("Show Full Schedule", value=False)
+    
+    if show_full:
+        st.dataframe(schedule_df, use_container_width=True)
+    else:
+        st.subheader("First 12 Months")
+        st.dataframe(schedule_df.head(12), use_container_width=True)
+        
+        # Payment numbers run 1..n, so every 12th row is a year end
+        yearly_data = schedule_df.iloc[11:120:12]
+        if len(yearly_data) > 0:
+            st.subheader("Year-End Summaries")
+            st.dataframe(yearly_data, use_container_width=True)
+
+@st.fragment
+def render_export(apartment_analyzer, investment_analyzer, refi, schedules):
+    st.header("💾 Export Data")
+    
+    apt_refi, inv_refi = refi['apt']['refinance'], refi['inv']['refinance']
+    
+    export_options = [
+        "Current Apartment Schedule",
+        "Current Investment Schedule"
+    ]
+    
+    if apt_refi:
+        export_options.append("Refinanced Apartment Schedule")
+    if inv_refi:
+        export_options.append("Refinanced Investment Schedule")
+    
+    export_options.append("Portfolio Summary")
+    
+    export_choice = st.selectbox("Choose Data to Export", export_options)
+    
+    # Generate export data
+    if export_choice == "Current Apartment Schedule":
+        export_df = schedules['apt_current']
+    elif export_choice == "Current Investment Schedule":
+        export_df = schedules['inv_current']
+    elif export_choice == "Refinanced Apartment Schedule":
+        export_df = schedules['apt_refi']
+    elif export_choice == "Refinanced Investment Schedule":
+        export_df = schedules['inv_refi']
+    else:  # Portfolio Summary
+        summary_data = {
+            'Loan': ['Apartment', 'Investment'],
+            'Principal': [apartment_analyzer.principal, investment_analyzer.principal],
+            'Current_Rate': [apartment_analyzer.annual_rate, investment_analyzer.annual_rate],
+            'Current_Term': [apartment_analyzer.years, investment_analyzer.years],
+            'Current_Payment': [apartment_analyzer.calculate_monthly_payment(), investment_analyzer.calculate_monthly_payment()],
+            'Refinanced': [apt_refi, inv_refi],
+            'New_Rate': [refi['apt']['new_rate'], refi['inv']['new_rate']],
+            'New_Term': [refi['apt']['new_term'], refi['inv']['new_term']],
+            'New_Payment': [refi['apt']['new_payment'], refi['inv']['new_payment']],
+            'Monthly_Savings': [refi['apt']['savings'], refi['inv']['savings']],
+            'Refi_Costs': [refi['apt']['refi_costs'], refi['inv']['refi_costs']]
+        }
+        export_df = pd.DataFrame(summary_data)
+    
+    # Preview
+    st.subheader("Data Preview")
+    st.dataframe(export_df.head(10), use_container_width=True)
+    
+    # Download button; serialized once per distinct export frame
+    csv_bytes = export_csv(export_df)
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"{export_choice.lower().replace(' ', '_')}_{timestamp}.csv"
+    
+    st.download_button(
+        label=f"📥 Download {export_choice}",
+        data=csv_bytes,
+        file_name=filename,
+        mime='text/csv'
+    )
+
 def main():
     st.title("🏠 Loan Analyzer Pro")
     st.markdown("**Comprehensive mortgage refinancing analysis with independent loan control**")
@@ -143,8 +467,8 @@ def main():
     inv_term = st.sidebar.number_input("Loan Term (years)", value=27.5, step=0.5, key="inv_term")
     
     # Create analyzers
-    apartment_analyzer = LoanAnalyzer(apt_principal, apt_rate, apt_term)
-    investment_analyzer = LoanAnalyzer(inv_principal, inv_rate, inv_term)
+    apartment_analyzer = get_analyzer(apt_principal, apt_rate, apt_term)
+    investment_analyzer = get_analyzer(inv_principal, inv_rate, inv_term)
     
     # Main dashboard
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -152,250 +476,29 @@ def main():
     ])
     
     with tab1:
-        st.header("Portfolio Overview")
-        
-        # Current loan summary
-        col1, col2, col3, col4 = st.columns(4)
-        
-        apt_payment = apartment_analyzer.calculate_monthly_payment()
-        inv_payment = investment_analyzer.calculate_monthly_payment()
-        total_payment = apt_payment + inv_payment
-        total_principal = apt_principal + inv_principal
-        
-        with col1:
-            st.metric("Total Loan Amount", f"${total_principal:,.0f}")
-        with col2:
-            st.metric("Total Monthly Payment", f"${total_payment:,.0f}")
-        with col3:
-            weighted_rate = (apt_principal * apt_rate + inv_principal * inv_rate) / total_principal
-            st.metric("Weighted Avg Rate", f"{weighted_rate:.2f}%")
-        with col4:
-            total_interest = (apt_payment * apt_term * 12 - apt_principal) + (inv_payment * inv_term * 12 - inv_principal)
-            st.metric("Total Interest (Life of Loans)", f"${total_interest:,.0f}")
-    
+        render_dashboard(apartment_analyzer, investment_analyzer)
     with tab2:
-        st.header("🔄 Independent Refinancing Analysis")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("🏢 Apartment Loan")
-            
-            apt_refi = st.checkbox("Refinance Apartment Loan", key="apt_refi")
-            
-            if apt_refi:
-                apt_new_rate = st.number_input("New Apartment Rate (%)", value=4.99, step=0.01, key="apt_new_rate")
-                apt_new_term = st.number_input("New Apartment Term (years)", value=25, step=1, key="apt_new_term")
-                apt_refi_costs = st.number_input("Apartment Refi Costs ($)", value=3000, step=100, key="apt_refi_costs")
-                
-                # Calculate new apartment payment
-                new_apt_analyzer = LoanAnalyzer(apt_principal, apt_new_rate, apt_new_term)
-                new_apt_payment = new_apt_analyzer.calculate_monthly_payment()
-                apt_savings = apt_payment - new_apt_payment
-                
-                st.write(f"**Current Payment:** ${apt_payment:,.0f}")
-                st.write(f"**New Payment:** ${new_apt_payment:,.0f}")
-                
-                if apt_savings > 0:
-                    st.success(f"**Monthly Savings:** ${apt_savings:,.0f}")
-                    st.success(f"**Break-even:** {apt_refi_costs / apt_savings:.1f} months")
-                else:
-                    st.error(f"**Monthly Increase:** ${abs(apt_savings):,.0f}")
-            else:
-                new_apt_payment = apt_payment
-                apt_savings = 0
-                apt_refi_costs = 0
-        
-        with col2:
-            st.subheader("🏘️ Investment Property")
-            
-            inv_refi = st.checkbox("Refinance Investment Property", key="inv_refi")
-            
-            if inv_refi:
-                inv_new_rate = st.number_input("New Investment Rate (%)", value=5.99, step=0.01, key="inv_new_rate")
-                inv_new_term = st.number_input("New Investment Term (years)", value=25, step=1, key="inv_new_term")
-                inv_refi_costs = st.number_input("Investment Refi Costs ($)", value=2000, step=100, key="inv_refi_costs")
-                
-                # Calculate new investment payment
-                new_inv_analyzer = LoanAnalyzer(inv_principal, inv_new_rate, inv_new_term)
-                new_inv_payment = new_inv_analyzer.calculate_monthly_payment()
-                inv_savings = inv_payment - new_inv_payment
-                
-                st.write(f"**Current Payment:** ${inv_payment:,.0f}")
-                st.write(f"**New Payment:** ${new_inv_payment:,.0f}")
-                
-                if inv_savings > 0:
-                    st.success(f"**Monthly Savings:** ${inv_savings:,.0f}")
-                    st.success(f"**Break-even:** {inv_refi_costs / inv_savings:.1f} months")
-                else:
-                    st.error(f"**Monthly Increase:** ${abs(inv_savings):,.0f}")
-            else:
-                new_inv_payment = inv_payment
-                inv_savings = 0
-                inv_refi_costs = 0
-        
-        # Combined results
-        st.subheader("🏠 Combined Portfolio Results")
-        
-        total_new_payment = new_apt_payment + new_inv_payment
-        total_savings = apt_savings + inv_savings
-        total_refi_costs = apt_refi_costs + inv_refi_costs
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Current Total Payment", f"${total_payment:,.0f}")
-        with col2:
-            st.metric("New Total Payment", f"${total_new_payment:,.0f}")
-        with col3:
-            if total_savings > 0:
-                st.metric("Total Monthly Savings", f"${total_savings:,.0f}", delta=f"+${total_savings:,.0f}")
-            else:
-                st.metric("Total Monthly Change", f"${total_savings:,.0f}", delta=f"{total_savings:,.0f}")
-        with col4:
-            if total_savings > 0 and total_refi_costs > 0:
-                st.metric("Combined Break-even", f"{total_refi_costs / total_savings:.1f} months")
-            else:
-                st.metric("Combined Break-even", "N/A")
+        refi = render_refinancing(apartment_analyzer, investment_analyzer)
     
-    with tab3:
-        st.header("📈 Amortization Schedules")
-        
-        loan_choice = st.selectbox("Select Loan to Visualize", ["Apartment", "Investment Property", "Both"])
-        
-        if loan_choice in ["Apartment", "Both"]:
-            st.subheader("🏢 Apartment Loan Amortization")
-            
-            # Choose current or refinanced
-            if apt_refi:
-                apt_schedule_choice = st.radio("Apartment Schedule", ["Current", "Refinanced"], key="apt_sched_choice")
-                if apt_schedule_choice == "Refinanced":
-                    display_analyzer = LoanAnalyzer(apt_principal, apt_new_rate, apt_new_term)
-                else:
-                    display_analyzer = apartment_analyzer
-            else:
-                display_analyzer = apartment_analyzer
-            
-            apt_schedule = display_analyzer.create_amortization_schedule()
-            apt_chart = create_amortization_chart(apt_schedule, "Apartment Loan Amortization")
-            st.plotly_chart(apt_chart, use_container_width=True)
-        
-        if loan_choice in ["Investment Property", "Both"]:
-            st.subheader("🏘️ Investment Property Amortization")
-            
-            # Choose current or refinanced
-            if inv_refi:
-                inv_schedule_choice = st.radio("Investment Schedule", ["Current", "Refinanced"], key="inv_sched_choice")
-                if inv_schedule_choice == "Refinanced":
-                    display_analyzer = LoanAnalyzer(inv_principal, inv_new_rate, inv_new_term)
-                else:
-                    display_analyzer = investment_analyzer
-            else:
-                display_analyzer = investment_analyzer
-            
-            inv_schedule = display_analyzer.create_amortization_schedule()
-            inv_chart = create_amortization_chart(inv_schedule, "Investment Property Amortization")
-            st.plotly_chart(inv_chart, use_container_width=True)
+    # Build each distinct schedule once and share it across tabs 3-5
+    schedules = {
+        'apt_current': apartment_analyzer.create_amortization_schedule(),
+        'inv_current': investment_analyzer.create_amortization_schedule(),
+        'apt_refi': None,
+        'inv_refi': None
+    }
+    if refi['apt']['refinance']:
+        schedules['apt_refi'] = get_analyzer(apt_principal, refi['apt']['new_rate'], refi['apt']['new_term']).create_amortization_schedule()
+    if refi['inv']['refinance']:
+        schedules['inv_refi'] = get_analyzer(inv_principal, refi['inv']['new_rate'], refi['inv']['new_term']).create_amortization_schedule()
     
+    # Tabs 3-5 are fragments so their own widgets rerun only that tab
+    with tab3:
+        render_amortization(schedules)
     with tab4:
-        st.header("📋 Detailed Payment Schedules")
-        
-        schedule_choice = st.selectbox("Select Schedule", [
-            "Current Apartment",
-            "Current Investment",
-            "Refinanced Apartment" if apt_refi else None,
-            "Refinanced Investment" if inv_refi else None
-        ])
-        
-        if schedule_choice == "Current Apartment":
-            schedule_df = apartment_analyzer.create_amortization_schedule()
-        elif schedule_choice == "Current Investment":
-            schedule_df = investment_analyzer.create_amortization_schedule()
-        elif schedule_choice == "Refinanced Apartment" and apt_refi:
-            refi_analyzer = LoanAnalyzer(apt_principal, apt_new_rate, apt_new_term)
-            schedule_df = refi_analyzer.create_amortization_schedule()
-        elif schedule_choice == "Refinanced Investment" and inv_refi:
-            refi_analyzer = LoanAnalyzer(inv_principal, inv_new_rate, inv_new_term)
-            schedule_df = refi_analyzer.create_amortization_schedule()
-        else:
-            st.warning("Please select a valid schedule option.")
-            return
-        
-        # Display options
-        show_full = st.checkbox("Show Full Schedule", value=False)
-        
-        if show_full:
-            st.dataframe(schedule_df, use_container_width=True)
-        else:
-            st.subheader("First 12 Months")
-            st.dataframe(schedule_df.head(12), use_container_width=True)
-            
-            yearly_data = schedule_df[schedule_df['Payment_Number'] % 12 == 0].head(10)
-            if len(yearly_data) > 0:
-                st.subheader("Year-End Summaries")
-                st.dataframe(yearly_data, use_container_width=True)
-    
+        render_schedules(schedules)
     with tab5:
-        st.header("💾 Export Data")
-        
-        export_options = [
-            "Current Apartment Schedule",
-            "Current Investment Schedule"
-        ]
-        
-        if apt_refi:
-            export_options.append("Refinanced Apartment Schedule")
-        if inv_refi:
-            export_options.append("Refinanced Investment Schedule")
-        
-        export_options.append("Portfolio Summary")
-        
-        export_choice = st.selectbox("Choose Data to Export", export_options)
-        
-        # Generate export data
-        if export_choice == "Current Apartment Schedule":
-            export_df = apartment_analyzer.create_amortization_schedule()
-        elif export_choice == "Current Investment Schedule":
-            export_df = investment_analyzer.create_amortization_schedule()
-        elif export_choice == "Refinanced Apartment Schedule":
-            refi_analyzer = LoanAnalyzer(apt_principal, apt_new_rate, apt_new_term)
-            export_df = refi_analyzer.create_amortization_schedule()
-        elif export_choice == "Refinanced Investment Schedule":
-            refi_analyzer = LoanAnalyzer(inv_principal, inv_new_rate, inv_new_term)
-            export_df = refi_analyzer.create_amortization_schedule()
-        else:  # Portfolio Summary
-            summary_data = {
-                'Loan': ['Apartment', 'Investment'],
-                'Principal': [apt_principal, inv_principal],
-                'Current_Rate': [apt_rate, inv_rate],
-                'Current_Term': [apt_term, inv_term],
-                'Current_Payment': [apt_payment, inv_payment],
-                'Refinanced': [apt_refi, inv_refi],
-                'New_Rate': [apt_new_rate if apt_refi else apt_rate, inv_new_rate if inv_refi else inv_rate],
-                'New_Term': [apt_new_term if apt_refi else apt_term, inv_new_term if inv_refi else inv_term],
-                'New_Payment': [new_apt_payment, new_inv_payment],
-                'Monthly_Savings': [apt_savings, inv_savings],
-                'Refi_Costs': [apt_refi_costs, inv_refi_costs]
-            }
-            export_df = pd.DataFrame(summary_data)
-        
-        # Preview
-        st.subheader("Data Preview")
-        st.dataframe(export_df.head(10), use_container_width=True)
-        
-        # Download button
-        csv_buffer = io.StringIO()
-        export_df.to_csv(csv_buffer, index=False)
-        csv_string = csv_buffer.getvalue()
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{export_choice.lower().replace(' ', '_')}_{timestamp}.csv"
-        
-        st.download_button(
-            label=f"📥 Download {export_choice}",
-            data=csv_string,
-            file_name=filename,
-            mime='text/csv'
-        )
+        render_export(apartment_analyzer, investment_analyzer, refi, schedules)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file